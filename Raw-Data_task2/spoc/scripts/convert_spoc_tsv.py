@@ -1,143 +1,170 @@
 #!/usr/bin/env python3
 import re
-import csv
 import os
+from functools import lru_cache
+from itertools import islice
 
 IN = r"c:\Users\Muhammad Abu Huraira\Documents\Assignments and Submissions\Semester 7\NLP\A03\spoc\test\spoc-testp.tsv"
 OUT_DIR = os.path.dirname(IN)
+# 1 MiB read/write buffers; SPOC TSVs are large and processed sequentially.
+IO_BUFFER = 1 << 20
+# String pieces (up to four per row) collected by write_chunk per write() call.
+WRITE_BATCH = 1 << 14
 
 # Conservative translation rules for many common C++ snippets found in the TSV.
 # This script focuses on per-line textual replacement for the "code" (2nd) column.
 # It is intentionally conservative (keeps non-matching lines unchanged) to avoid
 # introducing errors.
 
-def translate_code(code):
-    if code is None:
-        return ''
-    s = code.strip()
-    if s == '':
-        return s
+# Patterns are compiled once at import; translate_code runs once per TSV row.
+_RE_PUSHBACK = re.compile(r'\.push_back\s*\(')
+
+# Every whole-line rule fused into one alternation, so a line is matched in a
+# single pass instead of trying each pattern in turn. Each branch is a named
+# group; translate_code dispatches on m.lastgroup via _LINE_RULES below.
+_IDENT = r'[A-Za-z_][A-Za-z0-9_]*'
+_MASTER = re.compile('|'.join([
+    r'(?P<main>^int\s+main\s*\(\s*\)\s*\{?$)',
+    rf'(?P<str_decl>^string\s+(?P<str_name>{_IDENT})\s*;$)',
+    rf'(?P<char_arr>^char\s+(?P<char_name>{_IDENT})\[[0-9]+\]\s*;$)',
+    rf'(?P<int_decl>^(?:int|long\s+long|long|short\s+int|short)\s+(?P<int_name>{_IDENT})\s*;$)',
+    rf'(?P<bool_f>^bool\s+(?P<bool_f_name>{_IDENT})\s*=\s*false\s*;?$)',
+    rf'(?P<bool_t>^bool\s+(?P<bool_t_name>{_IDENT})\s*=\s*true\s*;?$)',
+    rf'(?P<vec>^vector<\s*(?:char|string|int)\s*>\s+(?P<vec_name>{_IDENT})\s*;$)',
+    rf'(?P<getline>^getline\(\s*cin\s*,\s*(?P<getline_name>{_IDENT})\s*\)\s*;?$)',
+    rf'(?P<cin_getline>^cin\.getline\(\s*(?P<cin_getline_name>{_IDENT})\s*,\s*[0-9]+\s*\)\s*;?$)',
+    r'(?P<if>^if\s*\((?P<if_cond>.*)\)\s*\{?$)',
+    r'(?P<elif>^else\s+if\s*\((?P<elif_cond>.*)\)\s*\{?$)',
+    r'(?P<else>^else\s*\{?$)',
+    rf'(?P<for_up>^for\s*\(\s*int\s+(?P<up_var>{_IDENT})\s*=\s*(?P<up_start>[0-9+-]+)\s*;\s*(?P=up_var)\s*<\s*(?P<up_end>[A-Za-z0-9_\.\(\)\-\+]+)\s*;\s*(?P=up_var)\+\+\s*\)\s*\{{?$)',
+    rf'(?P<for_down>^for\s*\(\s*int\s+(?P<down_var>{_IDENT})\s*=\s*(?P<down_start>[A-Za-z0-9_\(\)\-\+]+)\s*;\s*(?P=down_var)\s*>=\s*(?P<down_end>[0-9]+)\s*;\s*(?P=down_var)--\s*\)\s*\{{?$)',
+]))
+
+
+def _translate_if(m):
+    cond = m.group('if_cond').strip()
+    cond = cond.replace('&&', ' and ').replace('||', ' or ').replace('==', ' == ').replace('!=', ' != ')
+    cond = cond.replace('!',' not ')
+    return f"if {cond}:"
+
+
+def _translate_elif(m):
+    cond = m.group('elif_cond').strip()
+    cond = cond.replace('&&', ' and ').replace('||', ' or ')
+    return f"elif {cond}:"
+
+
+_LINE_RULES = {
+    # int main() {  -> def main():
+    'main': lambda m: 'def main():',
+    # simple declaration translations
+    'str_decl': lambda m: f"{m.group('str_name')} = ''",
+    'char_arr': lambda m: f"{m.group('char_name')} = ''",
+    'int_decl': lambda m: f"{m.group('int_name')} = 0",
+    'bool_f': lambda m: f"{m.group('bool_f_name')} = False",
+    'bool_t': lambda m: f"{m.group('bool_t_name')} = True",
+    # vector declarations
+    'vec': lambda m: f"{m.group('vec_name')} = []",
+    # getline(cin, var); or cin.getline(var, SIZE); -> var = input()
+    'getline': lambda m: f"{m.group('getline_name')} = input()",
+    'cin_getline': lambda m: f"{m.group('cin_getline_name')} = input()",
+    # simple if/else/elif conversions (strip trailing braces)
+    'if': _translate_if,
+    'elif': _translate_elif,
+    'else': lambda m: 'else:',
+    # for loops (common patterns)
+    'for_up': lambda m: f"for {m.group('up_var')} in range({m.group('up_start')}, {m.group('up_end')}):",
+    'for_down': lambda m: f"for {m.group('down_var')} in range({m.group('down_start')}, {m.group('down_end')}-1, -1):",
+}
 
-    # Normalize some common whitespace patterns
-    s = s.replace('\t', ' ').strip()
 
-    # int main() {  -> def main():
-    if re.match(r'^int\s+main\s*\(\s*\)\s*\{?$', s):
-        return 'def main():'
+def _translate_cin(s):
+    # cin >> var1 >> var2;  -> var1, var2 = input().split()
+    body = s[len('cin >>'):].strip().rstrip(';')
+    vars = [v for v in (p.strip() for p in body.split('>>')) if v]
+    if len(vars) == 1:
+        return f"{vars[0]} = input().strip()"
+    else:
+        return f"{', '.join(vars)} = input().split()"
+
+
+def _translate_cout(s):
+    body = s[len('cout <<'):].strip().rstrip(';')
+    # split by '<<', strip, and drop endl / '\n' parts in the same pass
+    parts = []
+    has_endl = False
+    for p in body.split('<<'):
+        p = p.strip()
+        if not p:
+            continue
+        if 'endl' in p or "'\\n'" in p or '"\\n"' in p:
+            has_endl = True
+        else:
+            parts.append(p)
+    if has_endl:
+        if len(parts) == 0:
+            return 'print()'
+        elif len(parts) == 1:
+            return f"print({parts[0]})"
+        else:
+            return f"print({', '.join(parts)})"
+    else:
+        # no newline -> print with end=''
+        if len(parts) == 1:
+            return f"print({parts[0]}, end='')"
+        else:
+            return f"print({', '.join(parts)}, end='')"
 
-    # return 0; -> return 0
-    if s == 'return 0;' or s == 'return 0;':
-        return 'return 0'
 
+# Exact-match lines answered without touching the regex engine.
+_FIXED_LINES = {
+    # return 0; -> return 0
+    'return 0;': 'return 0',
     # opening/closing braces - drop them (structure not preserved in TSV row-level)
-    if s == '{' or s == '}':
-        return ''
+    '{': '',
+    '}': '',
+    # break/continue
+    'break;': 'break',
+    'continue;': 'continue',
+}
 
-    # simple declaration translations
-    m = re.match(r'^string\s+([A-Za-z_][A-Za-z0-9_]*)\s*;$', s)
-    if m:
-        return f"{m.group(1)} = ''"
+# Every _MASTER branch starts with one of these; other lines skip the regex.
+_MASTER_PREFIXES = ('int', 'long', 'short', 'string', 'char', 'bool', 'vector<',
+                    'getline(', 'cin.getline(', 'if', 'else', 'for')
 
-    m = re.match(r'^char\s+([A-Za-z_][A-Za-z0-9_]*)\[[0-9]+\]\s*;$', s)
-    if m:
-        return f"{m.group(1)} = ''"
 
-    m = re.match(r'^(?:int|long\s+long|long|short\s+int|short)\s+([A-Za-z_][A-Za-z0-9_]*)\s*;$', s)
-    if m:
-        return f"{m.group(1)} = 0"
+# SPOC repeats many lines verbatim (braces, `int n;`, `cin >> n;`), and the
+# translation is a pure function of the cell text.
+@lru_cache(maxsize=1 << 16)
+def translate_code(code):
+    if code is None:
+        return ''
+    s = code.strip()
+    if s == '':
+        return s
 
-    m = re.match(r'^bool\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*false\s*;?$', s)
-    if m:
-        return f"{m.group(1)} = False"
-    m = re.match(r'^bool\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*true\s*;?$', s)
-    if m:
-        return f"{m.group(1)} = True"
+    # Normalize some common whitespace patterns
+    if '\t' in s:
+        s = s.replace('\t', ' ').strip()
 
-    # vector declarations
-    m = re.match(r'^vector<\s*char\s*>\s+([A-Za-z_][A-Za-z0-9_]*)\s*;$', s)
-    if m:
-        return f"{m.group(1)} = []"
-    m = re.match(r'^vector<\s*string\s*>\s+([A-Za-z_][A-Za-z0-9_]*)\s*;$', s)
-    if m:
-        return f"{m.group(1)} = []"
-    m = re.match(r'^vector<\s*int\s*>\s+([A-Za-z_][A-Za-z0-9_]*)\s*;$', s)
-    if m:
-        return f"{m.group(1)} = []"
-
-    # push_back -> append
-    s = re.sub(r'\.push_back\s*\(', '.append(', s)
+    fixed = _FIXED_LINES.get(s)
+    if fixed is not None:
+        return fixed
 
-    # cin >> var1 >> var2;  -> var1, var2 = input().split()
-    if s.startswith('cin >>'):
-        body = s[len('cin >>'):].strip().rstrip(';')
-        vars = [v.strip() for v in body.split('>>') if v.strip()]
-        if len(vars) == 1:
-            return f"{vars[0]} = input().strip()"
-        else:
-            return f"{', '.join(vars)} = input().split()"
+    # push_back -> append (no whole-line rule can match a line containing it,
+    # so rewriting before dispatch does not change which rule fires)
+    if '.push_back' in s:
+        s = _RE_PUSHBACK.sub('.append(', s)
 
-    # getline(cin, var); or cin.getline(var, SIZE); -> var = input()
-    m = re.match(r'^getline\(\s*cin\s*,\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)\s*;?$', s)
-    if m:
-        return f"{m.group(1)} = input()"
-    m = re.match(r'^cin\.getline\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*,\s*[0-9]+\s*\)\s*;?$', s)
-    if m:
-        return f"{m.group(1)} = input()"
-
-    # cout patterns
+    if s.startswith('cin >>'):
+        return _translate_cin(s)
     if s.startswith('cout <<'):
-        body = s[len('cout <<'):].strip().rstrip(';')
-        # split by '<<' and strip
-        parts = [p.strip() for p in re.split(r'<<', body) if p.strip()]
-        # detect endl or '\n'
-        if any('endl' in p or "'\\n'" in p or '"\\n"' in p for p in parts):
-            # remove endl parts
-            parts = [p for p in parts if 'endl' not in p and "'\\n'" not in p and '"\\n"' not in p]
-            if len(parts) == 0:
-                return 'print()'
-            elif len(parts) == 1:
-                return f"print({parts[0]})"
-            else:
-                return f"print({', '.join(parts)})"
-        else:
-            # no newline -> print with end=''
-            if len(parts) == 1:
-                return f"print({parts[0]}, end='')"
-            else:
-                return f"print({', '.join(parts)}, end='')"
+        return _translate_cout(s)
 
-    # simple if/else/elif conversions (strip trailing braces)
-    m = re.match(r'^if\s*\((.*)\)\s*\{?$', s)
-    if m:
-        cond = m.group(1).strip()
-        cond = cond.replace('&&', ' and ').replace('||', ' or ').replace('==', ' == ').replace('!=', ' != ')
-        cond = cond.replace('!',' not ')
-        return f"if {cond}:"
-
-    m = re.match(r'^else\s+if\s*\((.*)\)\s*\{?$', s)
-    if m:
-        cond = m.group(1).strip()
-        cond = cond.replace('&&', ' and ').replace('||', ' or ')
-        return f"elif {cond}:"
-
-    if re.match(r'^else\s*\{?$', s):
-        return 'else:'
-
-    # break/continue
-    if s == 'break;' :
-        return 'break'
-    if s == 'continue;' :
-        return 'continue'
-
-    # for loops (common patterns)
-    m = re.match(r'^for\s*\(\s*int\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*([0-9+-]+)\s*;\s*\1\s*<\s*([A-Za-z0-9_\.\(\)\-\+]+)\s*;\s*\1\+\+\s*\)\s*\{?$', s)
-    if m:
-        i, start, end = m.group(1), m.group(2), m.group(3)
-        return f"for {i} in range({start}, {end}):"
-    m = re.match(r'^for\s*\(\s*int\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*([A-Za-z0-9_\(\)\-\+]+)\s*;\s*\1\s*>=\s*([0-9]+)\s*;\s*\1--\s*\)\s*\{?$', s)
-    if m:
-        i, start, end = m.group(1), m.group(2), m.group(3)
-        return f"for {i} in range({start}, {end}-1, -1):"
+    if s.startswith(_MASTER_PREFIXES):
+        m = _MASTER.match(s)
+        if m:
+            return _LINE_RULES[m.lastgroup](m)
 
     # replace C++ true/false tokens
     s = s.replace('true', 'True').replace('false', 'False')
@@ -150,41 +177,49 @@ def translate_code(code):
 
 
 def write_chunk(lines, out_path):
-    with open(out_path, 'w', encoding='utf-8', newline='') as f:
-        f.write(header_line + '\n')
+    with open(out_path, 'w', encoding='utf-8', newline='', buffering=IO_BUFFER) as f:
+        # rows are joined and written in batches rather than one write() per row
+        out = [header_line, '\n']
         for ln in lines:
-            # parse TSV columns robustly
-            cols = ln.split('\t')
-            if len(cols) >= 2:
-                cols[1] = translate_code(cols[1])
-            f.write('\t'.join(cols) + '\n')
+            # only the code (2nd) column changes, so splice it out by tab
+            # position instead of splitting and re-joining every column
+            i1 = ln.find('\t')
+            if i1 >= 0:
+                i2 = ln.find('\t', i1 + 1)
+                end = i2 if i2 >= 0 else len(ln)
+                out.append(ln[:i1 + 1])
+                out.append(translate_code(ln[i1 + 1:end]))
+                out.append(ln[end:])
+            else:
+                out.append(ln)
+            out.append('\n')
+            if len(out) >= WRITE_BATCH:
+                f.write(''.join(out))
+                out.clear()
+        f.write(''.join(out))
 
 
 if __name__ == '__main__':
-    with open(IN, 'r', encoding='utf-8') as fh:
-        all_lines = [l.rstrip('\n') for l in fh]
+    # First pass only counts rows so chunk sizes are known up front; the second
+    # pass streams rows straight into their chunk file instead of holding the
+    # whole TSV in memory.
+    with open(IN, 'r', encoding='utf-8', buffering=IO_BUFFER) as fh:
+        n_lines = sum(1 for _ in fh)
 
-    if not all_lines:
+    if n_lines == 0:
         print('Input file empty')
         raise SystemExit(1)
 
-    header_line = all_lines[0]
-    data_lines = all_lines[1:]
-    total = len(data_lines)
+    total = n_lines - 1
     chunk_size = total // 4
     remainder = total % 4
 
-    indices = []
-    start = 0
-    for i in range(4):
-        add = chunk_size + (1 if i < remainder else 0)
-        end = start + add
-        indices.append((start, end))
-        start = end
-
-    for idx, (s_idx, e_idx) in enumerate(indices, start=1):
-        out_name = os.path.join(OUT_DIR, f"spoc-testp_py_chunk{idx}.tsv")
-        write_chunk(data_lines[s_idx:e_idx], out_name)
-        print(f'Wrote {out_name} with {e_idx - s_idx} data lines')
+    with open(IN, 'r', encoding='utf-8', buffering=IO_BUFFER) as fh:
+        header_line = next(fh).rstrip('\n')
+        for idx in range(1, 5):
+            count = chunk_size + (1 if idx <= remainder else 0)
+            out_name = os.path.join(OUT_DIR, f"spoc-testp_py_chunk{idx}.tsv")
+            write_chunk((l.rstrip('\n') for l in islice(fh, count)), out_name)
+            print(f'Wrote {out_name} with {count} data lines')
 
     print('Done')
@@ -9,6 +9,7 @@ but it places Python equivalents and pseudocode in the same row under `code_py`.
 """
 import re
 import csv
+from functools import lru_cache
 from pathlib import Path
 
 IN = Path(__file__).parent.parent / 'test' / 'spoc-testp.tsv'
@@ -17,21 +18,71 @@ OUT = Path(__file__).parent.parent / 'test' / 'spoc-testp_py.tsv'
 # Replacement rules: list of (pattern, repl) applied sequentially.
 # Many rules use regex and functions for contextual transforms.
 
+# Patterns are compiled once at import; convert_line runs once per TSV row.
+_RE_TYPE_KW = re.compile(r"\b(unsigned long long|unsigned long|unsigned int|long long|long|unsigned|int|double|float|short|size_t|bool)\b")
+_RE_VEC_DECL = re.compile(r"vector<[^>]+>\s*([A-Za-z_][A-Za-z0-9_]*)\s*;")
+_RE_STR_DECL = re.compile(r"\bstring\s+([A-Za-z_][A-Za-z0-9_]*)\s*;")
+_RE_CHAR_ARR_N = re.compile(r"char\s+([A-Za-z_][A-Za-z0-9_]*)\s*\[(\d+)\]\s*;")
+_RE_CHAR_ARR = re.compile(r"char\s+([A-Za-z_][A-Za-z0-9_]*)\s*\[\d+\]\s*;")
+_RE_DECL = re.compile(r"^\s*(?:int|long|double|float|short)\s+(.+);")
+_RE_ARRAY_DIM = re.compile(r"\[.*\]")
+_RE_SIZE = re.compile(r"([A-Za-z_][A-Za-z0-9_\[\]\.\'\"]*)\.size\(\)")
+_RE_SIZE_MINUS_1 = re.compile(r"([A-Za-z_][A-Za-z0-9_\[\]\.\'\"]*)\.size\(\)\s*-\s*1")
+_RE_STRLEN = re.compile(r"strlen\(([^)]+)\)")
+_RE_FOR_UP = re.compile(r"\s*for\s*\(\s*int\s+(\w+)\s*=\s*(\d+)\s*;\s*\1\s*<\s*([^;\)]+)\s*;\s*\1\+\+\s*\)\s*\{?")
+_RE_FOR_DOWN = re.compile(r"\s*for\s*\(\s*int\s+(\w+)\s*=\s*([^;]+)\s*;\s*\1\s*>=\s*([^;]+)\s*;\s*\1\-\-\s*\)\s*\{?")
+_RE_IF = re.compile(r"if\s*\((.*?)\)\s*\{?")
+_RE_ELSEIF = re.compile(r"else if\s*\((.*?)\)\s*\{?")
+_RE_ELSE = re.compile(r"else\s*\{?")
+_RE_PUSHBACK = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\.push_back\((.*)\);")
+_RE_BOOL = re.compile(r"\b(?:true|false)\b", re.IGNORECASE)
+_RE_LEAD = re.compile(r"\s*(?:(?P<for>for)|(?P<if>if|else if|else)\b)")
+
+# Indentation prefixes for the common nesting depths, built once.
+_INDENTS = tuple('    ' * i for i in range(64))
+
+# Literal rewrites done by repl_misc, applied together in one regex pass.
+_MISC_SUBS = {
+    '->': '.',
+    '::': '.',
+    '&&': 'and',
+    '||': 'or',
+    "\tn": '\n',
+    # return 0; -> return 0
+    'return 0;': 'return 0',
+    # slen/tlen placeholders
+    'slen()': 'len(s)',
+    'tlen()': 'len(t)',
+}
+_RE_MISC = re.compile('|'.join(re.escape(k) for k in _MISC_SUBS))
+
 # Helper transforms
 
+def _misc_sub(m):
+    return _MISC_SUBS[m.group(0)]
+
+
+def _bool_sub(m):
+    return 'True' if m.group(0).lower() == 'true' else 'False'
+
+
 def repl_types(line):
     # Remove common C++ type keywords but keep structure. Convert vector declarations.
-    line = re.sub(r"\b(unsigned long long|unsigned long|unsigned int|long long|long|unsigned|int|double|float|short|size_t|bool)\b", '', line)
+    line = _RE_TYPE_KW.sub('', line)
+    # the substring checks below skip each regex when its keyword is absent
     # vector<T> name; -> name = []
-    line = re.sub(r"vector<[^>]+>\s*([A-Za-z_][A-Za-z0-9_]*)\s*;", r"\1 = []", line)
+    if 'vector<' in line:
+        line = _RE_VEC_DECL.sub(r"\1 = []", line)
     # string s; -> s = ""
-    line = re.sub(r"\bstring\s+([A-Za-z_][A-Za-z0-9_]*)\s*;", r"\1 = ''", line)
-    # char a[110]; -> a = [''] * 110  (approx)
-    line = re.sub(r"char\s+([A-Za-z_][A-Za-z0-9_]*)\s*\[(\d+)\]\s*;", r"\1 = [''] * \2", line)
-    # char s[100005]; -> s = ''  (fallback)
-    line = re.sub(r"char\s+([A-Za-z_][A-Za-z0-9_]*)\s*\[\d+\]\s*;", r"\1 = ''", line)
+    if 'string' in line:
+        line = _RE_STR_DECL.sub(r"\1 = ''", line)
+    if 'char' in line:
+        # char a[110]; -> a = [''] * 110  (approx)
+        line = _RE_CHAR_ARR_N.sub(r"\1 = [''] * \2", line)
+        # char s[100005]; -> s = ''  (fallback)
+        line = _RE_CHAR_ARR.sub(r"\1 = ''", line)
     # simple declarations like 'int n, m;' -> 'n = 0; m = 0' -> produce 'n = 0; m = 0'
-    m = re.match(r"^\s*(?:int|long|double|float|short)\s+(.+);", line)
+    m = _RE_DECL.match(line)
     if m:
         rest = m.group(1)
         vars = [v.strip() for v in rest.split(',')]
@@ -41,7 +92,7 @@ def repl_types(line):
             if '=' in v:
                 assigns.append(v)
             else:
-                name = re.sub(r"\[.*\]", '', v).strip()
+                name = _RE_ARRAY_DIM.sub('', v).strip()
                 assigns.append(f"{name} = 0")
         return '; '.join(assigns)
     return line
@@ -56,11 +107,11 @@ def repl_cout(line):
     s = s.rstrip(';')
     # remove 'cout << '
     s = s.replace('cout << ', '')
-    parts = [p.strip() for p in s.split('<<')]
-    # remove possible 'endl' or '\n'
+    # remove possible 'endl' or '\n' while splitting
     end_arg = None
     cleaned = []
-    for p in parts:
+    for p in s.split('<<'):
+        p = p.strip()
         if p in ('endl', "'\\n'", '"\\n"'):
             end_arg = '\n'
             continue
@@ -86,7 +137,7 @@ def repl_cin(line):
         return line
     s = line.strip().rstrip(';')
     s = s.replace('cin >> ', '')
-    parts = [p.strip() for p in s.split('>>') if p.strip()]
+    parts = [v for v in (p.strip() for p in s.split('>>')) if v]
     if not parts:
         return '# read input'
     # If there's a single variable, read a token
@@ -101,8 +152,10 @@ def repl_cin(line):
 
 def repl_sizeof(line):
     # replace <container>.size() -> len(<container>)
-    line = re.sub(r"([A-Za-z_][A-Za-z0-9_\[\]\.\'\"]*)\.size\(\)", r"len(\1)", line)
-    line = re.sub(r"strlen\(([^)]+)\)", r"len(\1)", line)
+    if '.size()' in line:
+        line = _RE_SIZE.sub(r"len(\1)", line)
+    if 'strlen(' in line:
+        line = _RE_STRLEN.sub(r"len(\1)", line)
     # common placeholder functions used in dataset
     line = line.replace('slen()', 'len(s)')
     line = line.replace('tlen()', 'len(t)')
@@ -112,20 +165,23 @@ def repl_sizeof(line):
 def repl_for(line):
     # patterns for basic for-loops
     # for (int i = 0; i < n; i++) {
-    m = re.match(r"\s*for\s*\(\s*int\s+(\w+)\s*=\s*(\d+)\s*;\s*\1\s*<\s*([^;\)]+)\s*;\s*\1\+\+\s*\)\s*\{?", line)
+    m = _RE_FOR_UP.match(line)
     if m:
         var, start, end = m.groups()
         # normalize .size() usage inside end
-        end = re.sub(r"([A-Za-z_][A-Za-z0-9_\[\]\.\'\"]*)\.size\(\)", r"len(\1)", end)
+        if '.size()' in end:
+            end = _RE_SIZE.sub(r"len(\1)", end)
         return f"for {var} in range({start}, {end}):"
     # decrementing loop: for (int i = s.size() - 1; i >= 0; i--) {
-    m = re.match(r"\s*for\s*\(\s*int\s+(\w+)\s*=\s*([^;]+)\s*;\s*\1\s*>=\s*([^;]+)\s*;\s*\1\-\-\s*\)\s*\{?", line)
+    m = _RE_FOR_DOWN.match(line)
     if m:
         var, start, end = m.groups()
         # convert container.size() - 1 to len(container)-1
-        start = re.sub(r"([A-Za-z_][A-Za-z0-9_\[\]\.\'\"]*)\.size\(\)\s*-\s*1", r"len(\1)-1", start)
-        start = re.sub(r"([A-Za-z_][A-Za-z0-9_\[\]\.\'\"]*)\.size\(\)", r"len(\1)", start)
-        end = re.sub(r"([A-Za-z_][A-Za-z0-9_\[\]\.\'\"]*)\.size\(\)", r"len(\1)", end)
+        if '.size()' in start:
+            start = _RE_SIZE_MINUS_1.sub(r"len(\1)-1", start)
+            start = _RE_SIZE.sub(r"len(\1)", start)
+        if '.size()' in end:
+            end = _RE_SIZE.sub(r"len(\1)", end)
         # make explicit -1 stop
         return f"for {var} in range({start}, -1, -1):"
     # C-style other forms are left mostly unchanged but with braces removed
@@ -135,12 +191,15 @@ def repl_for(line):
 def repl_if(line):
     # replace && -> and, || -> or, == stays, != stays
     line = line.replace('&&', ' and ').replace('||', ' or ')
-    # non-greedy match for conditions
-    line = re.sub(r"if\s*\((.*?)\)\s*\{?", r"if \1:", line)
-    # else if
-    line = re.sub(r"else if\s*\((.*?)\)\s*\{?", r"elif \1:", line)
+    if line.lstrip().startswith('else if'):
+        # else if; the if rule would otherwise eat its inner 'if (...)' first
+        line = _RE_ELSEIF.sub(r"elif \1:", line)
+    else:
+        # non-greedy match for conditions
+        line = _RE_IF.sub(r"if \1:", line)
+        line = _RE_ELSEIF.sub(r"elif \1:", line)
     # else { -> else:
-    line = re.sub(r"else\s*\{?", "else:", line)
+    line = _RE_ELSE.sub("else:", line)
     return line
 
 
@@ -153,30 +212,35 @@ def repl_braces(line):
 
 def repl_pushback(line):
     # ans.push_back(x); -> ans.append(x)
-    line = re.sub(r"([A-Za-z_][A-Za-z0-9_]*)\.push_back\((.*)\);", r"\1.append(\2)", line)
+    if '.push_back(' in line:
+        line = _RE_PUSHBACK.sub(r"\1.append(\2)", line)
     return line
 
 
 def repl_misc(line):
-    line = line.replace('->', '.')
-    line = line.replace('::', '.')
-    line = line.replace('&&', 'and')
-    line = line.replace('||', 'or')
+    # all literal rewrites in a single scan of the line
+    line = _RE_MISC.sub(_misc_sub, line)
     # boolean literals
-    line = re.sub(r"\btrue\b", 'True', line, flags=re.IGNORECASE)
-    line = re.sub(r"\bfalse\b", 'False', line, flags=re.IGNORECASE)
-    line = line.replace("\tn", '\n')
-    # return 0; -> return 0
-    line = line.replace('return 0;', 'return 0')
-    line = line.replace('return 0;', 'return 0')
+    line = _RE_BOOL.sub(_bool_sub, line)
     # strip trailing semicolons
-    line = re.sub(r";\s*$", '', line)
-    # replace slen/tlen placeholders
-    line = line.replace('slen()', 'len(s)').replace('tlen()', 'len(t)')
+    stripped = line.rstrip()
+    if stripped.endswith(';'):
+        line = stripped[:-1]
     return line
 
 
+# Output depends only on (code, indent) and SPOC repeats many lines verbatim.
+@lru_cache(maxsize=1 << 16)
 def convert_line(code, indent):
+    # apply indentation spaces according to indent integer
+    try:
+        ind = int(indent)
+    except Exception:
+        ind = 0
+    prefix = _INDENTS[ind] if 0 <= ind < len(_INDENTS) else '    ' * ind
+    # empty / whitespace-only cells need no rule work
+    if not code or code.isspace():
+        return prefix
     # Apply transformations in order
     original = code
     line = code
@@ -189,24 +253,18 @@ def convert_line(code, indent):
     if 'cin' in line:
         line = repl_cin(line)
     line = repl_pushback(line)
-    # if line starts with for
-    if line.strip().startswith('for'):
-        line = repl_for(line)
-    # if line starts with if or else
-    if re.match(r"\s*(if|else if|else)\b", line):
-        line = repl_if(line)
+    # one match decides between the for and if/else rewrites, which are
+    # mutually exclusive since each keys on the line's leading keyword
+    m = _RE_LEAD.match(line)
+    if m:
+        line = repl_for(line) if m.lastgroup == 'for' else repl_if(line)
     # braces
     line = repl_braces(line)
     line = repl_misc(line)
-    # apply indentation spaces according to indent integer
-    try:
-        ind = int(indent)
-    except Exception:
-        ind = 0
-    py = ('    ' * ind) + line.strip()
+    py = prefix + line.strip()
     # Return fallback comment if conversion made no change
     if py.strip() == '' and original.strip() != '':
-        py = ('    ' * ind) + f"# {original.strip()}"
+        py = prefix + f"# {original.strip()}"
     return py
 
 
@@ -214,23 +272,23 @@ def main():
     if not IN.exists():
         print('Input TSV not found:', IN)
         return
-    rows = []
-    with IN.open('r', encoding='utf-8', newline='') as f:
-        reader = csv.DictReader(f, delimiter='\t')
-        headers = reader.fieldnames
+    # Convert and write each row as it is read; nothing is held beyond one row
+    with IN.open('r', encoding='utf-8', newline='') as f, \
+         OUT.open('w', encoding='utf-8', newline='') as out:
+        reader = csv.reader(f, delimiter='\t')
+        writer = csv.writer(out, delimiter='\t')
+        headers = next(reader)
+        idx_code = headers.index('code')
+        idx_indent = headers.index('indent')
+        n_cols = len(headers)
+        writer.writerow(headers + ['code_py'])
         for r in reader:
-            rows.append(r)
-    # Convert each row
-    for r in rows:
-        code = r.get('code', '')
-        indent = r.get('indent', '0')
-        r['code_py'] = convert_line(code, indent)
-    # Write out TSV
-    out_headers = headers + ['code_py'] if headers else list(rows[0].keys())
-    with OUT.open('w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=out_headers, delimiter='\t')
-        writer.writeheader()
-        for r in rows:
+            if not r:
+                continue
+            # pad short rows / drop stray extra fields so code_py lines up
+            if len(r) != n_cols:
+                r = (r + [''] * n_cols)[:n_cols]
+            r.append(convert_line(r[idx_code], r[idx_indent]))
             writer.writerow(r)
     print('Wrote', OUT)
 
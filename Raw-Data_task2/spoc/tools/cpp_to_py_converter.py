@@ -11,25 +11,58 @@ vectors/maps/sets, push_back/insert, etc.). It preserves indentation using the
 Limitations: complex C++ idioms, macros, templates and low-level I/O won't be
 perfectly translated. This is a first-pass automated conversion to speed up
 manual review.
+
+The per-line convert_* functions are type-annotated so the module can be
+compiled with mypyc (`mypyc cpp_to_py_converter.py` from this directory); the
+compiled extension is used whenever the module is imported, e.g.
+`import cpp_to_py_converter; cpp_to_py_converter.process_file(inp, out)`.
 """
 import csv
 import re
 import sys
+from functools import lru_cache
 from pathlib import Path
-
-
-def strip_type(s):
+from typing import Dict, List, Optional, Tuple
+
+# Patterns are compiled once at import; convert_line runs once per TSV row.
+_RE_TYPE_KW = re.compile(r"\b(long long|long|int|short|bool|char|double|float|string)\b")
+_RE_QUALIFIER = re.compile(r"\b(const|std::|unsigned|signed|static|volatile)\b")
+_RE_TEMPLATE_ARGS = re.compile(r"<[^>]+>")
+_RE_DECL = re.compile(r"^(?:[\w\s:<>,]+)\s+(.+);$")
+_RE_ARRAY_DIM = re.compile(r"\[.*\]")
+_RE_FOR = re.compile(r"for\s*\(\s*(?:int\s+)?(\w+)\s*=\s*(.+?)\s*;\s*\1\s*([<>=!]+)\s*(.+?)\s*;\s*(?:\+\+|\+\+\1|\1\+\+|\1\+\+)\s*\)")
+_RE_MINUS_ONE = re.compile(r"(\w+)\s*-\s*1")
+_RE_MINUS_ONE_TAIL = re.compile(r"\s*-\s*1")
+_RE_FOR_SIMPLE = re.compile(r"for\s*\(\s*(\w+)\s*=\s*(\d+)\s*;\s*\1\s*<\s*(\w+)\s*;\s*\1\+\+\s*\)")
+_RE_WHILE = re.compile(r"while\s*\((.+)\)\s*(.*)")
+_RE_FUNC_DEF = re.compile(r"[\w\s:<>,*&]+\s+(\w+)\s*\((.*)\)\s*{\s*$")
+_RE_MAIN = re.compile(r"int\s+main\s*\(\s*\)\s*{")
+_RE_RETURN_0 = re.compile(r"return\s+0\s*;")
+_RE_RETURN = re.compile(r"return\s+[^;]+;")
+_RE_DECL_START = re.compile(r"^(int|long|long long|string|bool|double|float|char)\b")
+_RE_VECTOR = re.compile(r"\bvector<[^>]+>\b")
+_RE_MAP = re.compile(r"\bmap<[^>]+>\b")
+_RE_SET = re.compile(r"\bset<[^>]+>\b")
+_RE_GETLINE = re.compile(r"getline\(\s*cin\s*,\s*(\w+)\s*\)\s*;")
+
+# Type tags stored in the per-program `types` dict. They are interned so
+# convert_cin can compare them by identity.
+_INT = sys.intern('int')
+_STRING = sys.intern('string')
+
+
+def strip_type(s: str) -> str:
     # remove common C++ types and qualifiers from a parameter or declaration
-    s = re.sub(r"\b(long long|long|int|short|bool|char|double|float|string)\b", "", s)
-    s = re.sub(r"\b(const|std::|unsigned|signed|static|volatile)\b", "", s)
-    s = re.sub(r"<[^>]+>", "", s)  # remove templates like vector<int>
+    s = _RE_TYPE_KW.sub("", s)
+    s = _RE_QUALIFIER.sub("", s)
+    s = _RE_TEMPLATE_ARGS.sub("", s)  # remove templates like vector<int>
     s = s.replace('*', '').replace('&', '')
     return s.strip()
 
 
-def convert_decl(line, types):
+def convert_decl(line: str, types: Dict[str, str]) -> Optional[str]:
     # e.g. 'int n, m, su = 0, su2 = 0, a, b, c;' -> create python assignments and record types
-    m = re.match(r"^(?:[\w\s:<>,]+)\s+(.+);$", line)
+    m = _RE_DECL.match(line)
     if not m:
         return None
     body = m.group(1)
@@ -39,54 +72,41 @@ def convert_decl(line, types):
         if '=' in p:
             name, val = [x.strip() for x in p.split('=', 1)]
             # track type default to int
-            types[name] = 'int'
+            types[sys.intern(name)] = _INT
             out_lines.append(f"{name} = {val}")
         else:
             name = p
             # remove array notation: s1[110] -> s1
-            name = re.sub(r"\[.*\]", "", name).strip()
+            name = _RE_ARRAY_DIM.sub("", name).strip()
             if name:
-                types[name] = 'int'
+                types[sys.intern(name)] = _INT
                 out_lines.append(f"{name} = 0")
     return '\n'.join(out_lines)
 
 
-def convert_cin(line, types):
+def convert_cin(line: str, types: Dict[str, str]) -> Optional[str]:
     # convert cin >> a >> b; -> a, b = map(int, input().split()) or strings if declared
     line = line.strip().rstrip(';')
     if not line.startswith('cin >>'):
         return None
     rest = line[len('cin >>'):].strip()
     vars = [v.strip() for v in rest.split('>>')]
-    # decide types
-    if all(types.get(v) == 'string' for v in vars if v in types):
+    # decide types: strings unless a declared var is not a string (one lookup per var)
+    if all(k is None or k is _STRING for k in map(types.get, vars)):
         return f"{', '.join(vars)} = input().split()"
     else:
         return f"{', '.join(vars)} = map(int, input().split())" if len(vars) > 1 else f"{vars[0]} = int(input())"
 
 
-def convert_cout(line):
+def convert_cout(line: str) -> Optional[str]:
     # convert cout << a << "/" << b << "\n"; -> print(f"{a}/{b}") conservative
     s = line.strip().rstrip(';')
     if not s.startswith('cout <<'):
         return None
-    parts = [p.strip() for p in s.split('<<')[1:]]
-    items = []
-    for p in parts:
-        if p in ('endl', '"\\n"', '\"\\n\"'):
-            continue
-        # string literal
-        if p.startswith('"') or p.startswith("'"):
-            items.append(p.strip('"\''))
-        else:
-            items.append('{' + p + '}')
-    # build f-string
-    fstr = ''.join(items)
-    # escape braces inside literals
-    fstr = fstr.replace('{', '{{').replace('}', '}}') if not any(t.startswith('{') for t in items) else fstr
-    # Better approach: rebuild with expressions in braces
+    # rebuild as an f-string: literals inline, expressions in braces
     parts2 = []
-    for p in parts:
+    for p in s.split('<<')[1:]:
+        p = p.strip()
         if p.startswith('"') or p.startswith("'"):
             parts2.append(p.strip('"\''))
         else:
@@ -95,9 +115,9 @@ def convert_cout(line):
     return f"print(f\"{fstr}\")"
 
 
-def convert_for(line):
+def convert_for(line: str) -> Optional[str]:
     # handle common for loops
-    m = re.match(r"for\s*\(\s*(?:int\s+)?(\w+)\s*=\s*(.+?)\s*;\s*\1\s*([<>=!]+)\s*(.+?)\s*;\s*(?:\+\+|\+\+\1|\1\+\+|\1\+\+)\s*\)", line)
+    m = _RE_FOR.match(line)
     if m:
         var, start, op, end = m.groups()
         start = start.strip()
@@ -107,26 +127,26 @@ def convert_for(line):
             return f"for {var} in range({start}, {end}):"
         if op == '<=':
             # try to simplify patterns like n - 1
-            if re.match(r"(\w+)\s*-\s*1", end):
-                en = re.sub(r"\s*-\s*1", "", end)
+            if _RE_MINUS_ONE.match(end):
+                en = _RE_MINUS_ONE_TAIL.sub("", end)
                 return f"for {var} in range({start}, {en}):"
             return f"for {var} in range({start}, {end} + 1):"
         if op in ('>','>='):
             return f"# TODO: translate C++ for descending loop: {line}"
     # fallback: try to catch simple i=0;i<n;i++
-    m2 = re.match(r"for\s*\(\s*(\w+)\s*=\s*(\d+)\s*;\s*\1\s*<\s*(\w+)\s*;\s*\1\+\+\s*\)", line)
+    m2 = _RE_FOR_SIMPLE.match(line)
     if m2:
         var, start, end = m2.groups()
         return f"for {var} in range({start}, {end}):"
     return None
 
 
-def convert_while(line):
+def convert_while(line: str) -> Optional[Tuple[str, Optional[List[str]]]]:
     # handle while(condition) { and inline statements separated by commas
     s = line.strip().rstrip(';')
     if not s.startswith('while'):
         return None
-    m = re.match(r"while\s*\((.+)\)\s*(.*)", s)
+    m = _RE_WHILE.match(s)
     if not m:
         return None
     cond, rest = m.groups()
@@ -140,9 +160,9 @@ def convert_while(line):
     return (py, None)
 
 
-def convert_function_def(line):
+def convert_function_def(line: str) -> Optional[str]:
     # e.g. int gcd(int a, int b) {
-    m = re.match(r"[\w\s:<>,*&]+\s+(\w+)\s*\((.*)\)\s*{\s*$", line)
+    m = _RE_FUNC_DEF.match(line)
     if not m:
         return None
     name = m.group(1)
@@ -161,26 +181,41 @@ def convert_function_def(line):
     return f"def {name}({', '.join(names)}):"
 
 
-def convert_line(line, types):
+def convert_line(line: str, types: Dict[str, str]) -> str:
+    # Only declarations (write `types`) and cin (reads `types`) depend on
+    # program state; every other line is a pure function of its text, and SPOC
+    # repeats many of them verbatim, so those results are cached.
+    s = line.strip()
+    if s.startswith('cin >>') or _RE_DECL_START.match(s):
+        return _convert_line(line, types)
+    return _convert_stateless_line(line)
+
+
+@lru_cache(maxsize=1 << 16)
+def _convert_stateless_line(line: str) -> str:
+    return _convert_line(line, {})
+
+
+def _convert_line(line: str, types: Dict[str, str]) -> str:
     # top-level conversions
     s = line.strip()
-    if s in ('{', '}', '};'):
+    if not s or s in ('{', '}', '};'):
         return ''
     # function defs
     fd = convert_function_def(line)
     if fd:
         return fd
     # main
-    if re.match(r"int\s+main\s*\(\s*\)\s*{", s):
+    if _RE_MAIN.match(s):
         return 'def main():'
     # return
-    if re.match(r"return\s+0\s*;", s):
+    if _RE_RETURN_0.match(s):
         return 'return'
-    if re.match(r"return\s+[^;]+;", s):
+    if _RE_RETURN.match(s):
         ex = s[len('return'):].strip().rstrip(';')
         return f"return {ex}"
     # declarations
-    if re.match(r"^(int|long|long long|string|bool|double|float|char)\b", s):
+    if _RE_DECL_START.match(s):
         d = convert_decl(s, types)
         if d:
             return d
@@ -196,9 +231,9 @@ def convert_line(line, types):
     s = s.replace('push_back(', 'append(')
     s = s.replace('->', '.')
     # vector,map,set
-    s = re.sub(r"\bvector<[^>]+>\b", 'list', s)
-    s = re.sub(r"\bmap<[^>]+>\b", 'dict', s)
-    s = re.sub(r"\bset<[^>]+>\b", 'set', s)
+    s = _RE_VECTOR.sub('list', s)
+    s = _RE_MAP.sub('dict', s)
+    s = _RE_SET.sub('set', s)
     s = s.replace('st.insert', 'st.add').replace('se.insert', 'se.add')
     s = s.replace('memset(', '# memset:')
     # for
@@ -215,7 +250,7 @@ def convert_line(line, types):
     # getline
     if 'getline(' in s:
         # getline(cin, str);
-        m = re.search(r"getline\(\s*cin\s*,\s*(\w+)\s*\)\s*;", s)
+        m = _RE_GETLINE.search(s)
         if m:
             return f"{m.group(1)} = input()"
     # getchar
@@ -227,6 +262,10 @@ def convert_line(line, types):
     return s
 
 
+# Indentation prefixes for the common nesting depths, built once.
+_INDENTS = tuple(' ' * (4 * i) for i in range(64))
+
+
 def process_file(input_path, output_path, examples_dir=None, max_examples=50):
     input_path = Path(input_path)
     output_path = Path(output_path)
@@ -236,10 +275,16 @@ def process_file(input_path, output_path, examples_dir=None, max_examples=50):
 
     with input_path.open('r', encoding='utf-8', errors='replace') as inf, \
          output_path.open('w', newline='', encoding='utf-8') as outf:
-        reader = csv.DictReader(inf, delimiter='\t')
-        fieldnames = reader.fieldnames
-        writer = csv.DictWriter(outf, fieldnames=fieldnames, delimiter='\t')
-        writer.writeheader()
+        reader = csv.reader(inf, delimiter='\t')
+        writer = csv.writer(outf, delimiter='\t')
+        fieldnames = next(reader)
+        writer.writerow(fieldnames)
+        n_cols = len(fieldnames)
+        idx_code = fieldnames.index('code')
+        idx_line = fieldnames.index('line')
+        idx_indent = fieldnames.index('indent')
+        idx_probid = fieldnames.index('probid')
+        idx_subid = fieldnames.index('subid')
 
         types = {}
         program_lines = []
@@ -247,9 +292,14 @@ def process_file(input_path, output_path, examples_dir=None, max_examples=50):
         current_key = None
 
         for row in reader:
+            if not row:
+                continue
+            # pad short rows / drop stray extra fields to match the header
+            if len(row) != n_cols:
+                row = (row + [''] * n_cols)[:n_cols]
             # reset types on new program when 'line' == '0'
             try:
-                line_num = int(row.get('line', '0'))
+                line_num = int(row[idx_line])
             except:
                 line_num = 0
             if line_num == 0:
@@ -263,12 +313,18 @@ def process_file(input_path, output_path, examples_dir=None, max_examples=50):
                     example_count += 1
                 program_lines = []
                 # compute key
-                probid = row.get('probid','')
-                subid = row.get('subid','')
+                probid = row[idx_probid]
+                subid = row[idx_subid]
                 current_key = f"p{probid}_s{subid}" if probid or subid else None
 
-            code = row.get('code','')
-            indent = int(row.get('indent','0') or 0)
+            code = row[idx_code]
+            # empty / whitespace-only cells skip conversion entirely
+            if not code or code.isspace():
+                row[idx_code] = ''
+                writer.writerow(row)
+                continue
+            indent = int(row[idx_indent] or 0)
+            prefix = _INDENTS[indent] if 0 <= indent < len(_INDENTS) else ' ' * 4 * indent
             py = convert_line(code, types)
             # normalize multi-line conversion: split and apply indentation to each
             out_lines = []
@@ -279,10 +335,10 @@ def process_file(input_path, output_path, examples_dir=None, max_examples=50):
                 if sub == '':
                     out_lines.append('')
                 else:
-                    out_lines.append((' ' * 4 * indent) + sub)
+                    out_lines.append(prefix + sub)
             py_text = '\n'.join(out_lines)
             # keep text same, replace code
-            row['code'] = py_text
+            row[idx_code] = py_text
             writer.writerow(row)
 
             # accumulate for example files without the TSV columns